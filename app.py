@@ -13,35 +13,168 @@ Run Instructions:
     3. Open http://127.0.0.1:5000 in your browser
 """
 
-from flask import Flask, render_template, request, redirect, url_for, session, flash, Response
+from flask import (Flask, render_template, request, redirect, url_for, session, flash, Response, g,
+                   stream_with_context, make_response)
 from datetime import datetime, date
+from collections import namedtuple, OrderedDict
+from jinja2 import FileSystemBytecodeCache
 import sqlite3
 import csv
 import io
 import os
+import hashlib
+import hmac
+import threading
 
 # ─── App Configuration ────────────────────────────────────────────────────────
 app = Flask(__name__)
 app.secret_key = "labrecord_secret_key_2024"  # Change in production
 
+MAX_UPLOAD_MB = 2
+app.config["MAX_CONTENT_LENGTH"] = MAX_UPLOAD_MB * 1024 * 1024  # Caps CSV imports
+
+# Outside debug mode: keep compiled templates on disk so new workers skip
+# recompiling them, and never stat template files on render
+if not app.debug:
+    app.jinja_env.auto_reload = False
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache()  # Per-user temp dir
+
 ADMIN_USERNAME = "admin"
-ADMIN_PASSWORD = "admin123"
+# SHA-256 of the admin password (default: admin123)
+ADMIN_PASSWORD_HASH = bytes.fromhex("240be518fabd2724ddb6f04eeb1da5967448d7e831c08c8fa822809f74c720a9")
 DATABASE = "database.db"
+ENTRIES_PAGE_SIZE = 200  # Max rows per page on the entries screen
+EXPORT_BATCH_SIZE = 500  # Rows written per chunk of a CSV export
+STUDENT_CACHE_SIZE = 4096  # Register numbers kept in the lookup cache
+
+# ─── SQL Statements ───────────────────────────────────────────────────────────
+# Kept as constants so every call passes the identical string; the sqlite3
+# statement cache on each thread's long-lived connection (see get_db) then
+# reuses the prepared statement across requests.
+# Each one selects only the columns its route or template actually reads.
+
+SQL_STUDENT_BY_REG = "SELECT id, name FROM students WHERE reg_no = ?"
+SQL_STUDENT_BY_ID = "SELECT name, reg_no FROM students WHERE id = ?"
+SQL_ALL_STUDENTS = "SELECT id, name, reg_no, dept FROM students ORDER BY name"
+SQL_INSERT_STUDENT = "INSERT INTO students (name, reg_no, dept) VALUES (?, ?, ?)"
+# Bulk import: duplicate reg_no rows are skipped by SQLite itself
+SQL_IMPORT_STUDENT = "INSERT OR IGNORE INTO students (name, reg_no, dept) VALUES (?, ?, ?)"
+SQL_DELETE_STUDENT = "DELETE FROM students WHERE id = ?"
+
+SQL_INSERT_ENTRY = """
+    INSERT INTO entries (student_id, lab_name, system_no, time_in, date)
+    VALUES (?, ?, ?, ?, ?)
+"""
+SQL_OPEN_CONFLICTS = """
+    SELECT e.system_no, e.student_id, s.name FROM entries e
+    JOIN students s ON e.student_id = s.id
+    WHERE e.date = ? AND e.time_out IS NULL
+      AND (e.system_no = ? OR e.student_id = ?)
+"""
+SQL_OPEN_ENTRY_FOR_STUDENT = """
+    SELECT id FROM entries
+    WHERE student_id = ? AND date = ? AND time_out IS NULL
+"""
+SQL_CLOSE_ENTRY = "UPDATE entries SET time_out = ? WHERE id = ?"
+
+# Dashboard: all stats at once (COUNT(time_out) skips open entries);
+# last_id also feeds the page's ETag
+SQL_DASHBOARD_STATS = """
+    SELECT COUNT(*)                        AS total_today,
+           COUNT(*) - COUNT(time_out)      AS inside_now,
+           (SELECT COUNT(*) FROM students) AS total_students,
+           MAX(id)                         AS last_id
+    FROM entries
+    WHERE date = ?
+"""
+SQL_RECENT_ENTRIES = """
+    SELECT s.name, s.reg_no, s.dept,
+           e.system_no, e.time_in, e.time_out
+    FROM entries e
+    JOIN students s ON e.student_id = s.id
+    WHERE e.date = ?
+    ORDER BY e.id DESC
+    LIMIT 10
+"""
+
+# Entries page and CSV export: filters are appended as needed
+SQL_ENTRIES_PAGE = """
+    SELECT e.id, s.name, s.reg_no, s.dept,
+           e.system_no, e.time_in, e.time_out, e.date
+    FROM entries e
+    JOIN students s ON e.student_id = s.id
+    WHERE 1 = 1
+"""
+SQL_EXPORT_ENTRIES = """
+    SELECT s.name, s.reg_no, s.dept, e.lab_name, e.system_no, e.time_in, e.time_out, e.date
+    FROM entries e JOIN students s ON e.student_id = s.id
+"""
 
 # ─── Database Helpers ─────────────────────────────────────────────────────────
 
-def get_db():
-    """Open a new database connection."""
-    conn = sqlite3.connect(DATABASE)
+def _apply_pragmas(conn):
+    """Per-connection settings (WAL mode is stored in the file by init_db)."""
+    conn.execute("PRAGMA synchronous = NORMAL")    # Safe with WAL, far fewer fsyncs
+    conn.execute("PRAGMA busy_timeout = 5000")     # Wait for locks instead of failing
+    conn.execute("PRAGMA temp_store = MEMORY")
+    conn.execute("PRAGMA foreign_keys = ON")
+
+
+def connect_db():
+    """Open a new, tuned database connection."""
+    conn = sqlite3.connect(DATABASE, timeout=5.0)
     conn.row_factory = sqlite3.Row  # Access columns by name
+    _apply_pragmas(conn)
+    return conn
+
+
+# One long-lived connection per worker thread: opened (and tuned) once,
+# then reused by every request that thread serves
+_local = threading.local()
+
+
+def get_db():
+    """Return this thread's connection, opening it on first use."""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = _local.conn = connect_db()
     return conn
 
 
+@app.teardown_appcontext
+def release_db(exc):
+    """Roll back anything a failed request left open; the connection stays."""
+    conn = getattr(_local, "conn", None)
+    if conn is not None and conn.in_transaction:
+        conn.rollback()
+
+
+# Dates are stored as day ordinals (date.toordinal()) and times as seconds
+# since midnight: smaller rows and indexes, and integer comparisons.
+# Deleting a student removes their entries too.
+ENTRIES_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        id          INTEGER PRIMARY KEY AUTOINCREMENT,
+        student_id  INTEGER NOT NULL,
+        lab_name    TEXT    NOT NULL DEFAULT 'Computer Lab',
+        system_no   TEXT,
+        time_in     INTEGER NOT NULL,
+        time_out    INTEGER,
+        date        INTEGER NOT NULL,
+        FOREIGN KEY (student_id) REFERENCES students(id) ON DELETE CASCADE
+    )
+"""
+
+
 def init_db():
     """Create tables if they don't already exist."""
-    conn = get_db()
+    conn = connect_db()
     cursor = conn.cursor()
 
+    # WAL lets readers work while a check-in writes; the setting persists
+    # in the database file, so it only needs to be set once here
+    cursor.execute("PRAGMA journal_mode = WAL")
+
     # Students table
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS students (
@@ -53,18 +186,7 @@ def init_db():
     """)
 
     # Entries table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS entries (
-            id          INTEGER PRIMARY KEY AUTOINCREMENT,
-            student_id  INTEGER NOT NULL,
-            lab_name    TEXT    NOT NULL DEFAULT 'Computer Lab',
-            system_no   TEXT,
-            time_in     TEXT    NOT NULL,
-            time_out    TEXT,
-            date        TEXT    NOT NULL,
-            FOREIGN KEY (student_id) REFERENCES students(id)
-        )
-    """)
+    cursor.execute(ENTRIES_TABLE_SQL.format(table="entries"))
 
     # Add system_no column to existing databases (safe migration)
     try:
@@ -72,10 +194,167 @@ def init_db():
     except Exception:
         pass  # Column already exists — ignore
 
+    # Rebuild entries on older databases whose foreign key lacks
+    # ON DELETE CASCADE or that still store dates/times as TEXT
+    # (SQLite can't alter a constraint or column type in place)
+    fks = cursor.execute("PRAGMA foreign_key_list(entries)").fetchall()
+    columns = {c["name"]: c["type"] for c in cursor.execute("PRAGMA table_info(entries)")}
+    if (any(fk["table"] == "students" and fk["on_delete"] != "CASCADE" for fk in fks)
+            or columns["date"] != "INTEGER"):
+        cursor.execute("PRAGMA foreign_keys = OFF")
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute(ENTRIES_TABLE_SQL.format(table="entries_new"))
+        # 'YYYY-MM-DD' → day ordinal (julianday of 0001-01-01 is 1721425.5),
+        # 'HH:MM:SS' → seconds since midnight. Entries of already-deleted
+        # students can't be shown anywhere; drop them.
+        cursor.execute("""
+            INSERT INTO entries_new (id, student_id, lab_name, system_no, time_in, time_out, date)
+            SELECT id, student_id, lab_name, system_no,
+                   CASE WHEN typeof(time_in) = 'text'
+                        THEN CAST(strftime('%s', '1970-01-01 ' || time_in) AS INTEGER)
+                        ELSE time_in END,
+                   CASE WHEN typeof(time_out) = 'text'
+                        THEN CAST(strftime('%s', '1970-01-01 ' || time_out) AS INTEGER)
+                        ELSE time_out END,
+                   CASE WHEN typeof(date) = 'text'
+                        THEN CAST(julianday(date) - 1721424.5 AS INTEGER)
+                        ELSE date END
+            FROM entries
+            WHERE student_id IN (SELECT id FROM students)
+        """)
+        cursor.execute("DROP TABLE entries")
+        cursor.execute("ALTER TABLE entries_new RENAME TO entries")
+        conn.commit()
+        cursor.execute("PRAGMA foreign_keys = ON")
+
+    # Indexes for the "who is inside today" lookups used on every check-in
+    # (students.reg_no is already indexed by its UNIQUE constraint)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_entries_date_timeout ON entries (date, time_out)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_entries_student_date ON entries (student_id, date, time_out)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_entries_system_date ON entries (system_no, date, time_out)")
+
+    # At most one open entry per system and per student each day — the
+    # database itself rejects a double booking, even under concurrent check-ins.
+    # One-time migration: older databases (without these indexes) may hold
+    # duplicate open entries. Close each older duplicate at the moment the
+    # newer one started, keeping only the latest open, so the indexes can
+    # be built. Once they exist, no new duplicates can appear.
+    existing = {r["name"] for r in cursor.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND name IN ('uq_open_system', 'uq_open_student')"
+    )}
+    if len(existing) < 2:
+        closed = 0
+        for column in ("system_no", "student_id"):
+            cursor.execute(f"""
+                UPDATE entries SET time_out = (
+                    SELECT MAX(entries.time_in, MIN(n.time_in)) FROM entries n
+                    WHERE n.{column} = entries.{column} AND n.date = entries.date
+                      AND n.time_out IS NULL AND n.id > entries.id
+                )
+                WHERE time_out IS NULL AND EXISTS (
+                    SELECT 1 FROM entries n
+                    WHERE n.{column} = entries.{column} AND n.date = entries.date
+                      AND n.time_out IS NULL AND n.id > entries.id
+                )
+            """)
+            closed += cursor.rowcount
+        if closed:
+            print(f"  Migration: closed {closed} duplicate open entr{'y' if closed == 1 else 'ies'} "
+                  "(Time Out set to the next check-in's Time In).")
+
+        cursor.execute("""CREATE UNIQUE INDEX IF NOT EXISTS uq_open_system
+                          ON entries (system_no, date) WHERE time_out IS NULL""")
+        cursor.execute("""CREATE UNIQUE INDEX IF NOT EXISTS uq_open_student
+                          ON entries (student_id, date) WHERE time_out IS NULL""")
+        conn.commit()
+
+    # Refresh planner statistics so the new indexes get picked up
+    cursor.execute("ANALYZE")
+
     conn.commit()
     conn.close()
 
 
+# ─── Date / Time Helpers ──────────────────────────────────────────────────────
+
+def now_seconds():
+    """Current local time as seconds since midnight."""
+    now = datetime.now()
+    return now.hour * 3600 + now.minute * 60 + now.second
+
+
+def parse_day(value):
+    """Turn a 'YYYY-MM-DD' string into a day ordinal, or None if invalid."""
+    try:
+        return date.fromisoformat(value).toordinal()
+    except (TypeError, ValueError):
+        return None
+
+
+@app.template_filter("day")
+def format_day(ordinal):
+    """Day ordinal → 'YYYY-MM-DD' (None stays None)."""
+    if ordinal is None:
+        return None
+    return date.fromordinal(ordinal).isoformat()
+
+
+@app.template_filter("clock")
+def format_clock(seconds):
+    """Seconds since midnight → 'HH:MM:SS' (None stays None)."""
+    if seconds is None:
+        return None
+    return f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+Student = namedtuple("Student", "id name")
+
+
+# Per-process LRU of reg_no → Student. Only hits are stored, so a student
+# added later is found right away. Shared by the worker's threads.
+_student_cache = OrderedDict()
+_student_cache_lock = threading.Lock()
+
+
+def find_student(reg_no, refresh=False):
+    """
+    Return the Student for a register number, or None.
+    Hits skip the database on every check-in/out. The cache is per process,
+    so another worker's delete/re-add can leave a stale id behind; callers
+    pass refresh=True to re-read just this reg_no when the database says
+    the id is wrong.
+    """
+    if not refresh:
+        with _student_cache_lock:
+            student = _student_cache.get(reg_no)
+            if student is not None:
+                _student_cache.move_to_end(reg_no)
+                return student
+
+    row = get_db().execute(SQL_STUDENT_BY_REG, (reg_no,)).fetchone()
+    with _student_cache_lock:
+        if row is None:
+            _student_cache.pop(reg_no, None)
+            return None
+        student = _student_cache[reg_no] = Student(row["id"], row["name"])
+        _student_cache.move_to_end(reg_no)
+        while len(_student_cache) > STUDENT_CACHE_SIZE:
+            _student_cache.popitem(last=False)
+    return student
+
+
+def forget_student(reg_no):
+    """Drop one register number from the lookup cache."""
+    with _student_cache_lock:
+        _student_cache.pop(reg_no, None)
+
+
+@app.before_request
+def stamp_today():
+    """Compute today's day ordinal once per request."""
+    g.today = date.today().toordinal()
+
+
 # ─── Auth Helpers ─────────────────────────────────────────────────────────────
 
 def is_logged_in():
@@ -95,6 +374,89 @@ def login_required(f):
     return decorated
 
 
+# ─── Caching Helpers ──────────────────────────────────────────────────────────
+
+def _build_id():
+    """Fingerprint of this release's code and templates."""
+    digest = hashlib.md5()
+    sources = [os.path.abspath(__file__)]
+    template_dir = os.path.join(app.root_path, app.template_folder)
+    sources += sorted(os.path.join(template_dir, f) for f in os.listdir(template_dir))
+    for path in sources:
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+# Part of every ETag, so a deploy that changes markup or formatting
+# invalidates pages browsers already hold
+BUILD_ID = _build_id()
+
+
+def make_etag(*parts):
+    """Build an ETag from the values a page was rendered from."""
+    return hashlib.md5(repr((BUILD_ID,) + parts).encode()).hexdigest()
+
+
+def with_etag(resp, etag):
+    """Tag a response and make the browser revalidate it on every visit."""
+    resp.set_etag(etag)
+    resp.cache_control.private = True
+    resp.cache_control.no_cache = True
+    return resp
+
+
+def not_modified(etag):
+    """
+    Return a 304 response if the client already has this version of the page,
+    else None. Pending flash messages always force a full render.
+    """
+    if "_flashes" in session or not request.if_none_match.contains(etag):
+        return None
+    return with_etag(make_response("", 304), etag)
+
+
+# ─── CSV Export ───────────────────────────────────────────────────────────────
+
+def iter_entries_csv(filter_date=""):
+    """
+    Yield the entries CSV in chunks of EXPORT_BATCH_SIZE rows.
+    Uses its own short-lived connection, so the thread's shared one is
+    never left mid-read if the client stops downloading.
+    """
+    sql = SQL_EXPORT_ENTRIES
+    params = ()
+    if filter_date:
+        sql += " WHERE e.date = ?"
+        params = (parse_day(filter_date),)
+    sql += " ORDER BY e.id DESC"
+
+    conn = connect_db()
+    try:
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerow(["Name", "Reg No", "Department", "Lab", "System No", "Time In", "Time Out", "Date"])
+
+        cursor = conn.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(EXPORT_BATCH_SIZE)
+            if not rows:
+                break
+            writer.writerows(
+                (*row[:5], format_clock(row["time_in"]), format_clock(row["time_out"]), format_day(row["date"]))
+                for row in rows
+            )
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate()
+
+        # Header only, when there are no rows
+        if output.tell():
+            yield output.getvalue()
+    finally:
+        conn.close()
+
+
 # ─── Public Routes ────────────────────────────────────────────────────────────
 
 @app.route("/")
@@ -120,52 +482,50 @@ def student_entry():
         return redirect(url_for("index"))
 
     conn = get_db()
+    today = g.today
+    now = now_seconds()
     # Look up the student
-    student = conn.execute(
-        "SELECT * FROM students WHERE reg_no = ?", (reg_no,)
-    ).fetchone()
-
-    if not student:
-        conn.close()
-        flash(f"Register Number '{reg_no}' not found. Please contact admin.", "danger")
-        return redirect(url_for("index"))
-
-    # Check if that system is already occupied today
-    today = date.today().isoformat()
-    sys_busy = conn.execute(
-        """SELECT e.id, s.name FROM entries e
-           JOIN students s ON e.student_id = s.id
-           WHERE e.system_no = ? AND e.date = ? AND e.time_out IS NULL""",
-        (system_no, today)
-    ).fetchone()
-
-    if sys_busy:
-        conn.close()
-        flash(f"⚠️ System {system_no} is already occupied by {sys_busy['name']}. Please choose another system.", "warning")
-        return redirect(url_for("index"))
-
-    # Check for an open entry (no time_out) for today
-    open_entry = conn.execute(
-        """SELECT * FROM entries
-           WHERE student_id = ? AND date = ? AND time_out IS NULL""",
-        (student["id"], today)
-    ).fetchone()
-
-    if open_entry:
-        conn.close()
-        flash(f"⚠️ {student['name']} is already inside the lab on System {open_entry['system_no']}!", "warning")
+    student = find_student(reg_no)
+
+    for attempt in range(2):
+        if not student:
+            flash(f"Register Number '{reg_no}' not found. Please contact admin.", "danger")
+            return redirect(url_for("index"))
+
+        # Mark Time In with system number; the partial unique indexes reject
+        # the insert if the system or the student already has an open entry
+        try:
+            conn.execute(
+                SQL_INSERT_ENTRY,
+                (student.id, "Computer Lab", system_no, now, today)
+            )
+            conn.commit()
+            break
+        except sqlite3.IntegrityError:
+            conn.rollback()
+
+        # Slow path: find out which open entry clashed
+        conflicts = conn.execute(
+            SQL_OPEN_CONFLICTS, (today, system_no, student.id)
+        ).fetchall()
+
+        sys_busy   = next((r for r in conflicts if r["system_no"] == system_no), None)
+        open_entry = next((r for r in conflicts if r["student_id"] == student.id), None)
+
+        if sys_busy:
+            flash(f"⚠️ System {system_no} is already occupied by {sys_busy['name']}. Please choose another system.", "warning")
+        elif open_entry:
+            flash(f"⚠️ {student.name} is already inside the lab on System {open_entry['system_no']}!", "warning")
+        elif attempt == 0:
+            # No clash, so the foreign key failed: the cached id is stale
+            # (student deleted or re-added by another worker). Retry once.
+            student = find_student(reg_no, refresh=True)
+            continue
+        else:
+            flash("Could not record your entry. Please try again.", "danger")
         return redirect(url_for("index"))
 
-    # Mark Time In with system number
-    now = datetime.now().strftime("%H:%M:%S")
-    conn.execute(
-        "INSERT INTO entries (student_id, lab_name, system_no, time_in, date) VALUES (?, ?, ?, ?, ?)",
-        (student["id"], "Computer Lab", system_no, now, today)
-    )
-    conn.commit()
-    conn.close()
-
-    flash(f"✅ Welcome, {student['name']}! Assigned to System {system_no}. Time In: {now}.", "success")
+    flash(f"✅ Welcome, {student.name}! Assigned to System {system_no}. Time In: {format_clock(now)}.", "success")
     return redirect(url_for("index"))
 
 
@@ -181,36 +541,39 @@ def student_exit():
         return redirect(url_for("index"))
 
     conn = get_db()
-    student = conn.execute(
-        "SELECT * FROM students WHERE reg_no = ?", (reg_no,)
-    ).fetchone()
+    student = find_student(reg_no)
 
     if not student:
-        conn.close()
         flash(f"Register Number '{reg_no}' not found.", "danger")
         return redirect(url_for("index"))
 
-    today = date.today().isoformat()
+    today = g.today
     open_entry = conn.execute(
-        """SELECT * FROM entries
-           WHERE student_id = ? AND date = ? AND time_out IS NULL""",
-        (student["id"], today)
+        SQL_OPEN_ENTRY_FOR_STUDENT, (student.id, today)
     ).fetchone()
 
     if not open_entry:
-        conn.close()
-        flash(f"No open entry found for {student['name']} today. Please check in first.", "info")
+        # The cached id may be stale (student deleted or re-added by another
+        # worker): look the student up again before giving up
+        fresh = find_student(reg_no, refresh=True)
+        if not fresh:
+            flash(f"Register Number '{reg_no}' not found.", "danger")
+            return redirect(url_for("index"))
+        if fresh.id != student.id:
+            student = fresh
+            open_entry = conn.execute(
+                SQL_OPEN_ENTRY_FOR_STUDENT, (student.id, today)
+            ).fetchone()
+
+    if not open_entry:
+        flash(f"No open entry found for {student.name} today. Please check in first.", "info")
         return redirect(url_for("index"))
 
-    now = datetime.now().strftime("%H:%M:%S")
-    conn.execute(
-        "UPDATE entries SET time_out = ? WHERE id = ?",
-        (now, open_entry["id"])
-    )
+    now = now_seconds()
+    conn.execute(SQL_CLOSE_ENTRY, (now, open_entry["id"]))
     conn.commit()
-    conn.close()
 
-    flash(f"👋 Goodbye, {student['name']}! Time Out recorded at {now}.", "success")
+    flash(f"👋 Goodbye, {student.name}! Time Out recorded at {format_clock(now)}.", "success")
     return redirect(url_for("index"))
 
 
@@ -226,7 +589,9 @@ def admin_login():
         username = request.form.get("username", "")
         password = request.form.get("password", "")
 
-        if username == ADMIN_USERNAME and password == ADMIN_PASSWORD:
+        # Constant-time compare so response timing doesn't leak the password
+        password_hash = hashlib.sha256(password.encode()).digest()
+        if username == ADMIN_USERNAME and hmac.compare_digest(password_hash, ADMIN_PASSWORD_HASH):
             session["admin_logged_in"] = True
             flash("Welcome back, Admin!", "success")
             return redirect(url_for("admin_dashboard"))
@@ -254,71 +619,89 @@ def admin_dashboard():
     - Total registered students
     """
     conn = get_db()
-    today = date.today().isoformat()
+    today = g.today
 
-    total_today = conn.execute(
-        "SELECT COUNT(*) FROM entries WHERE date = ?", (today,)
-    ).fetchone()[0]
+    stats = conn.execute(SQL_DASHBOARD_STATS, (today,)).fetchone()
 
-    inside_now = conn.execute(
-        "SELECT COUNT(*) FROM entries WHERE date = ? AND time_out IS NULL", (today,)
-    ).fetchone()[0]
-
-    total_students = conn.execute(
-        "SELECT COUNT(*) FROM students"
-    ).fetchone()[0]
+    # Any check-in, check-out or student change moves one of these stats
+    etag = make_etag(today, *stats)
+    cached = not_modified(etag)
+    if cached:
+        return cached
 
     # Latest 10 entries for quick view
-    recent_entries = conn.execute("""
-        SELECT e.id, s.name, s.reg_no, s.dept,
-               e.lab_name, e.system_no, e.time_in, e.time_out, e.date
-        FROM entries e
-        JOIN students s ON e.student_id = s.id
-        WHERE e.date = ?
-        ORDER BY e.id DESC
-        LIMIT 10
-    """, (today,)).fetchall()
+    recent_entries = conn.execute(SQL_RECENT_ENTRIES, (today,)).fetchall()
 
-    conn.close()
-
-    return render_template(
+    return with_etag(make_response(render_template(
         "admin_dashboard.html",
-        total_today=total_today,
-        inside_now=inside_now,
-        total_students=total_students,
+        total_today=stats["total_today"],
+        inside_now=stats["inside_now"],
+        total_students=stats["total_students"],
         recent_entries=recent_entries,
         today=today
-    )
+    )), etag)
 
 
 @app.route("/admin/entries")
 @login_required
 def admin_entries():
-    """View all entries with optional date filter."""
+    """
+    View entries with optional date filter, newest first.
+    Keyset-paged by id (?before_id= for older, ?after_id= for newer pages)
+    so each page only reads `limit` rows.
+    """
     filter_date = request.args.get("filter_date", "")
+    before_id   = request.args.get("before_id", type=int)
+    after_id    = request.args.get("after_id", type=int)
+    limit       = request.args.get("limit", ENTRIES_PAGE_SIZE, type=int)
+    limit       = max(1, min(limit, ENTRIES_PAGE_SIZE))
     conn = get_db()
 
+    sql = SQL_ENTRIES_PAGE
+    params = []
     if filter_date:
-        entries = conn.execute("""
-            SELECT e.id, s.name, s.reg_no, s.dept,
-                   e.lab_name, e.system_no, e.time_in, e.time_out, e.date
-            FROM entries e
-            JOIN students s ON e.student_id = s.id
-            WHERE e.date = ?
-            ORDER BY e.id DESC
-        """, (filter_date,)).fetchall()
+        sql += " AND e.date = ?"
+        params.append(parse_day(filter_date))  # Invalid date → NULL → no rows
+    if after_id is not None:
+        # Walk forwards from the page we came from, then flip to newest-first
+        sql += " AND e.id > ? ORDER BY e.id ASC LIMIT ?"
+        params += [after_id, limit + 1]  # Extra row tells us if there is a newer page
+        entries = conn.execute(sql, params).fetchall()
+        has_newer = len(entries) > limit
+        entries = entries[:limit][::-1]
+        has_older = bool(entries)
     else:
-        entries = conn.execute("""
-            SELECT e.id, s.name, s.reg_no, s.dept,
-                   e.lab_name, e.system_no, e.time_in, e.time_out, e.date
-            FROM entries e
-            JOIN students s ON e.student_id = s.id
-            ORDER BY e.id DESC
-            LIMIT 200
-        """).fetchall()
-
-    conn.close()
-    return render_template("admin_entries.html", entries=entries, filter_date=filter_date)
+        if before_id:
+            sql += " AND e.id < ?"
+            params.append(before_id)
+        sql += " ORDER BY e.id DESC LIMIT ?"
+        params.append(limit + 1)  # Extra row tells us if there is an older page
+        entries = conn.execute(sql, params).fetchall()
+        has_older = len(entries) > limit
+        entries = entries[:limit]
+        has_newer = bool(before_id)
+
+    newer_id = None
+    if has_newer:
+        # An empty page past the end still links back to the rows above it
+        newer_id = entries[0]["id"] if entries else before_id - 1
+    older_id = entries[-1]["id"] if has_older else None
+
+    # The page is fully determined by its rows, so skip rendering if unchanged
+    etag = make_etag(filter_date, before_id, after_id, limit, newer_id, older_id,
+                     [tuple(e) for e in entries])
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
+    return with_etag(make_response(render_template(
+        "admin_entries.html",
+        entries=entries,
+        filter_date=filter_date,
+        newer_id=newer_id,
+        older_id=older_id,
+        limit=limit
+    )), etag)
 
 
 @app.route("/admin/students")
@@ -326,10 +709,7 @@ def admin_entries():
 def admin_students():
     """View all registered students."""
     conn = get_db()
-    students = conn.execute(
-        "SELECT * FROM students ORDER BY name"
-    ).fetchall()
-    conn.close()
+    students = conn.execute(SQL_ALL_STUDENTS).fetchall()
     return render_template("admin_students.html", students=students)
 
 
@@ -347,77 +727,105 @@ def admin_add_student():
 
     conn = get_db()
     try:
-        conn.execute(
-            "INSERT INTO students (name, reg_no, dept) VALUES (?, ?, ?)",
-            (name, reg_no, dept)
-        )
+        conn.execute(SQL_INSERT_STUDENT, (name, reg_no, dept))
         conn.commit()
         flash(f"Student '{name}' added successfully.", "success")
     except sqlite3.IntegrityError:
         flash(f"Register Number '{reg_no}' already exists.", "danger")
-    finally:
-        conn.close()
 
     return redirect(url_for("admin_students"))
 
 
+def _is_header(record):
+    """True for a header row such as 'Name, Reg No, Dept' or 'Student Name, Register Number, ...'."""
+    cells = [cell.strip().lower() for cell in record[:2]] + [""]
+    return "name" in cells[0] and "reg" in cells[1]
+
+
+@app.errorhandler(413)
+def upload_too_large(exc):
+    """Uploads above MAX_CONTENT_LENGTH are rejected before being read."""
+    flash(f"File too large — the limit is {MAX_UPLOAD_MB} MB.", "danger")
+    return redirect(url_for("admin_students"))
+
+
+@app.route("/admin/students/import", methods=["POST"])
+@login_required
+def admin_import_students():
+    """
+    Bulk-add students from an uploaded CSV (Name, Reg No, Department).
+    All rows go in one transaction, so SQLite syncs to disk once.
+    """
+    upload = request.files.get("file")
+    if not upload or not upload.filename:
+        flash("Please choose a CSV file to import.", "danger")
+        return redirect(url_for("admin_students"))
+
+    try:
+        text = upload.read().decode("utf-8-sig")  # Tolerate Excel's BOM
+    except UnicodeDecodeError:
+        flash("The file must be a UTF-8 encoded CSV.", "danger")
+        return redirect(url_for("admin_students"))
+
+    rows, invalid, seen_data = [], 0, False
+    for record in csv.reader(io.StringIO(text)):
+        if not any(cell.strip() for cell in record):
+            continue  # Blank line
+        first_row, seen_data = not seen_data, True
+        if first_row and _is_header(record):
+            continue
+        if len(record) < 3 or not all(cell.strip() for cell in record[:3]):
+            invalid += 1
+            continue
+        name, reg_no, dept = (cell.strip() for cell in record[:3])
+        rows.append((name, reg_no.upper(), dept))
+
+    conn = get_db()
+    conn.execute("BEGIN IMMEDIATE")
+    before = conn.total_changes
+    conn.executemany(SQL_IMPORT_STUDENT, rows)
+    added = conn.total_changes - before
+    conn.commit()
+
+    message = f"Imported {added} student(s)."
+    if len(rows) > added:
+        message += f" {len(rows) - added} already registered."
+    if invalid:
+        message += f" {invalid} incomplete row(s) skipped."
+    flash(message, "success" if added else "warning")
+    return redirect(url_for("admin_students"))
+
+
 @app.route("/admin/students/delete/<int:student_id>", methods=["POST"])
 @login_required
 def admin_delete_student(student_id):
-    """Delete a student (and their entries via cascade logic)."""
+    """Delete a student (their entries go with them via ON DELETE CASCADE)."""
     conn = get_db()
-    student = conn.execute(
-        "SELECT name FROM students WHERE id = ?", (student_id,)
-    ).fetchone()
+    # Lock out concurrent check-ins for this student until the delete commits
+    conn.execute("BEGIN IMMEDIATE")
+    student = conn.execute(SQL_STUDENT_BY_ID, (student_id,)).fetchone()
 
     if student:
-        # Also delete all entries for this student
-        conn.execute("DELETE FROM entries WHERE student_id = ?", (student_id,))
-        conn.execute("DELETE FROM students WHERE id = ?", (student_id,))
+        conn.execute(SQL_DELETE_STUDENT, (student_id,))
         conn.commit()
+        forget_student(student["reg_no"])
         flash(f"Student '{student['name']}' deleted.", "success")
     else:
+        conn.rollback()
         flash("Student not found.", "danger")
 
-    conn.close()
     return redirect(url_for("admin_students"))
 
 
 @app.route("/admin/export")
 @login_required
 def admin_export():
-    """Export all entries to a CSV file."""
+    """Export all entries to a CSV file, streamed in chunks."""
     filter_date = request.args.get("filter_date", "")
-    conn = get_db()
-
-    if filter_date:
-        rows = conn.execute("""
-            SELECT s.name, s.reg_no, s.dept, e.lab_name, e.system_no, e.time_in, e.time_out, e.date
-            FROM entries e JOIN students s ON e.student_id = s.id
-            WHERE e.date = ?
-            ORDER BY e.id DESC
-        """, (filter_date,)).fetchall()
-    else:
-        rows = conn.execute("""
-            SELECT s.name, s.reg_no, s.dept, e.lab_name, e.system_no, e.time_in, e.time_out, e.date
-            FROM entries e JOIN students s ON e.student_id = s.id
-            ORDER BY e.id DESC
-        """).fetchall()
-
-    conn.close()
-
-    # Build CSV in memory
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(["Name", "Reg No", "Department", "Lab", "System No", "Time In", "Time Out", "Date"])
-    for row in rows:
-        writer.writerow(list(row))
-
-    output.seek(0)
     filename = f"lab_entries_{filter_date or 'all'}.csv"
 
     return Response(
-        output.getvalue(),
+        stream_with_context(iter_entries_csv(filter_date)),
         mimetype="text/csv",
         headers={"Content-Disposition": f"attachment; filename={filename}"}
     )
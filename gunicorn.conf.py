@@ -0,0 +1,22 @@
+"""
+Gunicorn settings for running the Lab Record System in production.
+
+Usage:
+    gunicorn app:app
+"""
+
+import os
+
+bind = "0.0.0.0:8000"
+
+# Threaded workers: requests are I/O-bound (SQLite + template rendering),
+# so threads let concurrent check-ins overlap while one waits on the DB.
+worker_class = "gthread"
+workers = os.cpu_count() or 2
+threads = 8
+
+
+def on_starting(server):
+    """Create tables and indexes once, before any worker starts."""
+    from app import init_db
+    init_db()